@@ -5,15 +5,27 @@ Run this once to set up your index, then update .env.local with the index ID
 """
 
 import os
+import re
 import requests
-import json
 from dotenv import load_dotenv
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 # Load environment variables
 load_dotenv("../.env.local")
 
 TL_API = "https://api.twelvelabs.io/v1.3"
 TL_KEY = os.environ.get("TL_API_KEY", "")
+TL_INDEXES_URL = f"{TL_API}/indexes"
+
+# Single keep-alive session shared by every TwelveLabs call in this script
+SESSION = requests.Session()
+SESSION.headers.update({"x-api-key": TL_KEY})
+SESSION.mount("https://", HTTPAdapter(
+    pool_connections=20,
+    pool_maxsize=50,
+    max_retries=Retry(total=3, backoff_factor=0.3, status_forcelist=[502, 503, 504])
+))
 
 def create_index():
     """Create a new TwelveLabs index for video analysis"""
@@ -42,16 +54,10 @@ def create_index():
         "addons": ["thumbnail"]  # Generate thumbnails for scenes
     }
 
-    headers = {
-        "x-api-key": TL_KEY,
-        "Content-Type": "application/json"
-    }
-
     try:
         print("📡 Sending request to TwelveLabs API...")
-        response = requests.post(
-            f"{TL_API}/indexes",
-            headers=headers,
+        response = SESSION.post(
+            TL_INDEXES_URL,
             json=index_config,
             timeout=30
         )
@@ -103,20 +109,23 @@ def update_env_file(index_id):
         with open(env_file_path, 'r') as f:
             content = f.read()
 
-        # Replace the index ID line
-        lines = content.split('\n')
-        updated_lines = []
+        # Nothing to do if the file already points at this index
+        new_line = f'TL_INDEX_ID={index_id}'
+        if new_line in content.splitlines():
+            print("✅ .env.local already uses this index")
+            return
 
-        for line in lines:
-            if line.startswith('TL_INDEX_ID='):
-                updated_lines.append(f'TL_INDEX_ID={index_id}')
-                print(f"📝 Updated TL_INDEX_ID in .env.local")
-            else:
-                updated_lines.append(line)
+        # Replace the index ID line in a single pass
+        updated, count = re.subn(r'^TL_INDEX_ID=.*$', new_line, content, flags=re.M)
+        if not count:
+            print("⚠️  No TL_INDEX_ID line found in .env.local")
+            print(f"💡 Please manually add {new_line} to .env.local")
+            return
+        print(f"📝 Updated TL_INDEX_ID in .env.local")
 
         # Write back to file
         with open(env_file_path, 'w') as f:
-            f.write('\n'.join(updated_lines))
+            f.write(updated)
 
         print("✅ .env.local updated successfully!")
 
@@ -130,10 +139,8 @@ def check_existing_indexes():
     if not TL_KEY or TL_KEY == "xxx":
         return False
 
-    headers = {"x-api-key": TL_KEY}
-
     try:
-        response = requests.get(f"{TL_API}/indexes", headers=headers, timeout=10)
+        response = SESSION.get(TL_INDEXES_URL, timeout=10)
 
         if response.ok:
             indexes = response.json()
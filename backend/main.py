@@ -1,53 +1,230 @@
 import os
 import time
-import uuid
-import requests
-import re
-import subprocess
-from typing import Optional, List, Dict
-from fastapi import FastAPI, UploadFile, File, Form, HTTPException, Body
+import secrets
+import hmac
+import hashlib
+import logging
+import queue
+import asyncio
+import shutil
+import tempfile
+import threading
+import socket
+import ipaddress
+import httpx
+import orjson
+from collections import Counter
+from contextlib import nullcontext
+from dataclasses import dataclass
+from typing import Optional, List, Dict, Tuple
+from fastapi import FastAPI, UploadFile, File, Form, HTTPException, BackgroundTasks, Request
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel
+from fastapi.responses import ORJSONResponse
+from pydantic import BaseModel, ConfigDict, Field
 from dotenv import load_dotenv
+from logging.handlers import QueueHandler, QueueListener
+from store import MemoryStore, RedisStore, CountingTTLCache
+
+# Log records are handed to a queue and written to stderr by a listener
+# thread, so request handlers never block on the console
+log_queue = queue.Queue(-1)
+log_listener = QueueListener(log_queue, logging.StreamHandler())
+logger = logging.getLogger("video_api")
+logger.addHandler(QueueHandler(log_queue))
+logger.propagate = False
 
 # Load environment variables from parent directory's .env.local
 load_dotenv("../.env.local")
 
-# TwelveLabs API configuration
-TL_API = "https://api.twelvelabs.io/v1.3"
-TL_KEY = os.environ.get("TL_API_KEY", "")
-INDEX_ID = os.environ.get("TL_INDEX_ID", "")
+# Allowed CORS origins, overridable with a comma-separated CORS_ORIGINS
+DEFAULT_CORS_ORIGINS = (
+    # Local development
+    "http://localhost:3000",
+    "http://localhost:3001",
+    "http://localhost:3002",
+    "http://127.0.0.1:3000",
+    "http://127.0.0.1:3001",
+    "http://127.0.0.1:3002",
+    # Vercel deployment
+    "https://advertising-psi.vercel.app",
+    "https://advertising-aneh2n3mm-soulemane-sows-projects.vercel.app",
+)
+
+@dataclass(frozen=True, slots=True)
+class Config:
+    """
+    Settings read from the environment once at import time
+    """
+    tl_key: str
+    tl_api: str
+    index_id: str
+    # Signing secret of the webhook registered in the TwelveLabs dashboard for
+    # /api/tl/webhook. When set, task status is pushed to us instead of polled.
+    webhook_secret: str
+    cors_origins: Tuple[str, ...]
+    # Video records live in Redis when set, otherwise in process memory
+    redis_url: str
+    # Source videos kept for edit jobs, least recently used evicted past the budget
+    source_cache_dir: str
+    source_cache_bytes: int
+    # Level of the video_api logger, e.g. DEBUG to turn on request diagnostics
+    log_level: str
+
+CFG = Config(
+    tl_key=os.environ.get("TL_API_KEY", ""),
+    tl_api="https://api.twelvelabs.io/v1.3",
+    index_id=os.environ.get("TL_INDEX_ID", ""),
+    webhook_secret=os.environ.get("TL_WEBHOOK_SECRET", ""),
+    cors_origins=tuple(
+        origin.strip()
+        for origin in os.environ.get("CORS_ORIGINS", "").split(",")
+        if origin.strip()
+    ) or DEFAULT_CORS_ORIGINS,
+    redis_url=os.environ.get("REDIS_URL", ""),
+    source_cache_dir=os.environ.get("SOURCE_CACHE_DIR", os.path.join(tempfile.gettempdir(), "video_sources")),
+    source_cache_bytes=int(float(os.environ.get("SOURCE_CACHE_GB", "10")) * 1024 ** 3),
+    log_level=os.environ.get("LOG_LEVEL", "INFO").upper()
+)
+
+logger.setLevel(CFG.log_level)
 
-if not TL_KEY:
+if not CFG.tl_key:
     raise RuntimeError("TL_API_KEY environment variable is required")
 
-app = FastAPI(title="Video Analysis API", version="1.0.0")
+class OriginSetCORSMiddleware(CORSMiddleware):
+    """
+    CORSMiddleware that checks origins against a frozenset instead of
+    scanning the allow-list on every request
+    """
+
+    def __init__(self, app, **kwargs):
+        super().__init__(app, **kwargs)
+        self.allow_origins = frozenset(self.allow_origins)
+
+app = FastAPI(
+    title="Video Analysis API",
+    version="1.0.0",
+    default_response_class=ORJSONResponse
+)
 
 # CORS middleware for development and production
-# Allows localhost and Vercel deployment domains
 app.add_middleware(
-    CORSMiddleware,
-    allow_origins=[
-        # Local development
-        "http://localhost:3000",
-        "http://localhost:3001",
-        "http://localhost:3002",
-        "http://127.0.0.1:3000",
-        "http://127.0.0.1:3001",
-        "http://127.0.0.1:3002",
-        # Vercel deployment
-        "https://advertising-psi.vercel.app",
-        "https://advertising-aneh2n3mm-soulemane-sows-projects.vercel.app",
-    ],
+    OriginSetCORSMiddleware,
+    allow_origins=CFG.cors_origins,
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
 )
 
-# In-memory database for hackathon (use real DB in production)
-DB = {}
+# Video records by videoId; Redis makes them survive restarts and lets
+# several workers serve the same videos
+DB = RedisStore(CFG.redis_url) if CFG.redis_url else MemoryStore()
+
+# Edit jobs by jobId, updated by the background ffmpeg pipeline;
+# they expire with their output files JOB_TTL after submission, oldest
+# first once MAX_JOBS are kept
+JOB_TTL = 24 * 3600
+MAX_JOBS = 1000
+
+def remove_job_outputs(job_id: str, job: dict):
+    shutil.rmtree(job["outputDir"], ignore_errors=True)
+
+JOBS = CountingTTLCache("jobs", MAX_JOBS, JOB_TTL, on_evict=remove_job_outputs)
+
+# Concurrent ffmpeg processes allowed across all edit jobs
+FFMPEG_SLOTS = asyncio.Semaphore(os.cpu_count() or 1)
+
+# Seconds before a single ffmpeg invocation is killed
+FFMPEG_TIMEOUT = 300
+# How far (seconds) a cut may sit from a keyframe and still be stream-copied
+KEYFRAME_TOLERANCE = 0.05
+
+# Scratch space for edit job intermediates, in order of preference: tmpfs
+# first, then the temp dir (containers often give /dev/shm only 64 MB)
+SCRATCH_ROOTS = tuple(
+    root for root in ("/dev/shm", tempfile.gettempdir()) if os.path.isdir(root)
+)
+
+# Free scratch bytes required to accept a new edit job
+SCRATCH_MIN_FREE = 1024 * 1024 * 1024
+
+# Source downloads in flight by videoId, shared by concurrent edit jobs
+SOURCE_DOWNLOADS: Dict[str, asyncio.Task] = {}
+
+# Redirects followed when downloading a source video, each one re-checked
+MAX_SOURCE_REDIRECTS = 5
+
+# Cached source paths being read by running edit jobs, never evicted
+SOURCES_IN_USE = Counter()
+
+# Evictions run in worker threads; one at a time, so two of them never
+# pick the same least recently used file
+EVICTION_LOCK = threading.Lock()
+
+# H.264 encoder flags for re-encoding ffmpeg passes; switched to NVENC at
+# startup when the GPU encoder actually works on this machine
+CPU_VIDEO_ENCODER = ("-c:v", "libx264", "-preset", "veryfast", "-crf", "23", "-threads", "0")
+NVENC_VIDEO_ENCODER = ("-c:v", "h264_nvenc", "-preset", "p4", "-cq", "23")
+VIDEO_ENCODER = CPU_VIDEO_ENCODER
+
+# TwelveLabs task status -> our (status, progress, message)
+STATUS_MAP: Dict[str, Tuple[str, int, str]] = {
+    "pending": ("processing", 25, "Video queued for processing"),
+    "indexing": ("indexing", 50, "Analyzing video content"),
+    "ready": ("completed", 100, "Analysis complete"),
+    "failed": ("error", 0, "Analysis failed"),
+}
+
+# Our statuses that TwelveLabs will never move a video out of
+TERMINAL_STATUSES = frozenset({"completed", "error"})
+
+# In-flight TwelveLabs task lookups by (task_id, request headers), shared by
+# concurrent callers
+INFLIGHT_TASKS: Dict[Tuple[str, frozenset], asyncio.Task] = {}
+
+# Minimum seconds between upstream status checks for the same video
+STATUS_POLL_INTERVAL = 1.0
+
+# Seconds a background analysis fetch may take before another one may start
+PREFETCH_TIMEOUT = 60
+
+# Maximum age in seconds of a webhook signature timestamp
+WEBHOOK_TOLERANCE = 300
+
+# Uploads up to this size are held in memory, larger ones spooled to disk
+UPLOAD_MEMORY_LIMIT = 64 * 1024 * 1024
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+
+# Bytes of a TwelveLabs response body included in debug logs
+LOG_BODY_LIMIT = 512
+
+# Shared async HTTP/2 client for TwelveLabs; every request reuses its
+# keep-alive pool instead of blocking the event loop on a new connection,
+# and carries the base URL and API key so call sites pass only a path
+TL_CLIENT = httpx.AsyncClient(
+    base_url=CFG.tl_api,
+    headers={"x-api-key": CFG.tl_key},
+    timeout=httpx.Timeout(10.0, connect=5.0),
+    limits=httpx.Limits(max_keepalive_connections=100, max_connections=200, keepalive_expiry=60),
+    http2=True
+)
+
+@app.on_event("startup")
+async def start_logging():
+    log_listener.start()
+
+@app.on_event("shutdown")
+async def close_tl_client():
+    await TL_CLIENT.aclose()
+    await DB.close()
+    log_listener.stop()
+
+# Most video ids accepted by one batch status request
+MAX_BATCH_IDS = 100
 
 class VideoStatus(BaseModel):
+    model_config = ConfigDict(extra="ignore", frozen=True)
+
     id: str
     status: str
     progress: int
@@ -56,7 +233,15 @@ class VideoStatus(BaseModel):
     task_id: Optional[str] = None
     analysis: Optional[dict] = None
 
+class BatchStatusRequest(BaseModel):
+    model_config = ConfigDict(extra="ignore", frozen=True)
+
+    # Bounded so one request can't take over the TwelveLabs connection pool
+    ids: List[str] = Field(max_length=MAX_BATCH_IDS)
+
 class EditRequest(BaseModel):
+    model_config = ConfigDict(extra="ignore", frozen=True)
+
     videoId: str
     selections: List[Dict[str, float]]  # [{"startMs": 0, "endMs": 3500}, ...]
     templateId: str
@@ -68,243 +253,497 @@ class EditRequest(BaseModel):
 async def root():
     return {"message": "Video Analysis API", "status": "running"}
 
-@app.post("/api/videos")
-async def create_video(
-    file: Optional[UploadFile] = File(None),
-    url: Optional[str] = Form(None)
+async def submit_to_twelvelabs(
+    video_id: str,
+    url: Optional[str] = None,
+    upload_path: Optional[str] = None,
+    upload_data: Optional[bytes] = None,
+    filename: Optional[str] = None,
+    content_type: Optional[str] = None
 ):
     """
-    Upload a video file or URL to TwelveLabs for analysis
-    Returns a videoId for tracking the analysis progress
+    Submit a video to TwelveLabs in the background and record its task_id
     """
-    print("=" * 50)
-    print("🚀 VIDEO UPLOAD REQUEST RECEIVED")
-    print("=" * 50)
-    print(f"📁 File: {file.filename if file else 'None'}")
-    print(f"🔗 URL: {url if url else 'None'}")
-
     try:
-        # Validate inputs
-        if not file and not url:
-            print("❌ VALIDATION ERROR: No file or URL provided")
-            raise HTTPException(status_code=400, detail="Provide either file or url")
-
-        # Ensure index exists
-        if not INDEX_ID:
-            print(f"❌ CONFIG ERROR: INDEX_ID not set (current value: '{INDEX_ID}')")
-            raise HTTPException(
-                status_code=500,
-                detail="Create your TwelveLabs index once and set TL_INDEX_ID in .env"
-            )
-
-        print(f"✅ CONFIG OK: INDEX_ID = {INDEX_ID}")
-        print(f"✅ CONFIG OK: TL_KEY = {TL_KEY[:10]}...{TL_KEY[-10:] if len(TL_KEY) > 20 else TL_KEY}")
-
-        headers = {"x-api-key": TL_KEY}
-        task_id = None
-
         if url:
             # Handle URL upload - TwelveLabs requires multipart/form-data for all requests
-            print(f"🔗 PROCESSING URL: {url}")
+            logger.debug("🔗 PROCESSING URL: %s", url)
 
             files = {
-                "index_id": (None, INDEX_ID),
+                "index_id": (None, CFG.index_id),
                 "video_url": (None, url)
             }
 
-            response = requests.post(
-                f"{TL_API}/tasks",
-                headers=headers,
+            response = await TL_CLIENT.post(
+                "/tasks",
                 files=files,
                 timeout=30
             )
-            print(f"📊 TwelveLabs Response Status: {response.status_code}")
-            print(f"📄 TwelveLabs Response: {response.text}")
+        else:
+            # Handle file upload
+            logger.debug("📁 PROCESSING FILE: %s", filename)
+            logger.debug("📝 Content Type: %s", content_type)
+
+            with open(upload_path, "rb") if upload_path else nullcontext(upload_data) as upload:
+                # Hand the upload straight to httpx; a spooled file is streamed
+                # to TwelveLabs in chunks instead of being read into memory
+                files = {
+                    "video_file": (filename, upload, content_type)
+                }
+                data = {
+                    "index_id": CFG.index_id
+                }
+
+                logger.debug("📡 Sending to TwelveLabs API: %s/tasks", CFG.tl_api)
+                response = await TL_CLIENT.post(
+                    "/tasks",
+                    files=files,
+                    data=data,
+                    timeout=30
+                )
+
+        logger.debug("📊 TwelveLabs Response Status: %s", response.status_code)
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("📄 TwelveLabs Response: %s", response.content[:LOG_BODY_LIMIT])
 
-            response.raise_for_status()
-            response_data = response.json()
-            # TwelveLabs returns _id instead of task_id
-            task_id = response_data.get("_id") or response_data.get("task_id")
-            print(f"✅ TwelveLabs Task Created: {task_id}")
+        response.raise_for_status()
+        response_data = orjson.loads(response.content)
+        # TwelveLabs returns _id instead of task_id
+        task_id = response_data.get("_id") or response_data.get("task_id")
+        if not task_id:
+            raise ValueError("TwelveLabs response did not include a task id")
+        logger.debug("✅ TwelveLabs Task Created: %s", task_id)
+
+        await DB.link_task(task_id, video_id)
+        await DB.update(video_id, {
+            "status": "processing",
+            "progress": 10,
+            "message": "Video submitted to TwelveLabs for analysis",
+            "task_id": task_id
+        })
 
-        elif file:
-            # Handle file upload
-            print(f"📁 PROCESSING FILE: {file.filename}")
-            print(f"📏 File Size: {file.size} bytes")
-            print(f"📝 Content Type: {file.content_type}")
+        # Keep the upload as the source for later edit jobs
+        if upload_path or upload_data:
+            try:
+                path = await asyncio.to_thread(cache_upload, video_id, upload_path, upload_data)
+                # Moved into the cache, so the finally below must not delete it
+                upload_path = None
+                await asyncio.to_thread(evict_sources, path)
+            except OSError as e:
+                logger.warning("⚠️ Failed to cache source for %s: %s", video_id, e)
+
+    except httpx.HTTPError as e:
+        logger.warning("❌ TWELVELABS API ERROR: %s", e)
+        await DB.update(video_id, {
+            "status": "error",
+            "progress": 0,
+            "message": "Failed to submit video to TwelveLabs",
+            "error": f"TwelveLabs API error: {str(e)}"
+        })
+    except Exception as e:
+        logger.exception("❌ Submission to TwelveLabs failed for %s", video_id)
+        await DB.update(video_id, {
+            "status": "error",
+            "progress": 0,
+            "message": "Failed to submit video to TwelveLabs",
+            "error": str(e)
+        })
+    finally:
+        if upload_path:
+            os.unlink(upload_path)
 
-            file_content = await file.read()
-            print(f"📦 File Content Read: {len(file_content)} bytes")
+@app.post("/api/videos")
+async def create_video(
+    background_tasks: BackgroundTasks,
+    file: Optional[UploadFile] = File(None),
+    url: Optional[str] = Form(None)
+):
+    """
+    Upload a video file or URL to TwelveLabs for analysis
+    Returns a videoId immediately; the TwelveLabs submission runs in the
+    background and its progress is reported by the status endpoint
+    """
+    logger.debug("🚀 VIDEO UPLOAD REQUEST RECEIVED file=%s url=%s", file.filename if file else None, url)
 
-            files = {
-                "video_file": (file.filename, file_content, file.content_type)
-            }
-            data = {
-                "index_id": INDEX_ID
-            }
+    try:
+        # Validate inputs
+        if not file and not url:
+            logger.debug("❌ VALIDATION ERROR: No file or URL provided")
+            raise HTTPException(status_code=400, detail="Provide either file or url")
 
-            print(f"📡 Sending to TwelveLabs API: {TL_API}/tasks")
-            response = requests.post(
-                f"{TL_API}/tasks",
-                headers=headers,
-                files=files,
-                data=data,
-                timeout=30
+        # Ensure index exists
+        if not CFG.index_id:
+            logger.error("❌ CONFIG ERROR: INDEX_ID not set (current value: '%s')", CFG.index_id)
+            raise HTTPException(
+                status_code=500,
+                detail="Create your TwelveLabs index once and set TL_INDEX_ID in .env"
             )
-            print(f"📊 TwelveLabs Response Status: {response.status_code}")
-            print(f"📄 TwelveLabs Response: {response.text}")
 
-            response.raise_for_status()
-            response_data = response.json()
-            # TwelveLabs returns _id instead of task_id
-            task_id = response_data.get("_id") or response_data.get("task_id")
-            print(f"✅ TwelveLabs Task Created: {task_id}")
+        logger.debug("✅ CONFIG OK: INDEX_ID = %s", CFG.index_id)
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("✅ CONFIG OK: TL_KEY = %s...%s", CFG.tl_key[:10], CFG.tl_key[-10:] if len(CFG.tl_key) > 20 else CFG.tl_key)
 
         # Generate our internal video ID
-        video_id = f"vid_{uuid.uuid4().hex[:8]}"
-        print(f"🆔 Generated Video ID: {video_id}")
+        video_id = f"vid_{secrets.token_hex(4)}"
+        logger.debug("🆔 Generated Video ID: %s", video_id)
+
+        upload_path = None
+        upload_data = None
+        if not url:
+            # FastAPI closes the UploadFile once this handler returns, so keep
+            # small uploads in memory and spool larger ones to our own temp
+            # file for the background submission to read
+            logger.debug("📏 File Size: %s bytes", file.size)
+            if file.size is not None and file.size <= UPLOAD_MEMORY_LIMIT:
+                upload_data = await file.read()
+            else:
+                with tempfile.NamedTemporaryFile(delete=False) as upload:
+                    await asyncio.to_thread(shutil.copyfileobj, file.file, upload, UPLOAD_CHUNK_SIZE)
+                upload_path = upload.name
 
         # Store in our database
         video_data = {
-            "status": "processing",
-            "progress": 10,
-            "message": "Video submitted to TwelveLabs for analysis",
-            "task_id": task_id,
+            "status": "uploading",
+            "progress": 5,
+            "message": "Submitting video to TwelveLabs",
+            "task_id": None,
             "analysis": None,
+            "source_url": url,
             "created_at": time.time()
         }
-        DB[video_id] = video_data
-        print(f"💾 Stored in DB: {video_data}")
+        await DB.update(video_id, video_data)
+        logger.debug("💾 Stored in DB: %s", video_data)
+
+        background_tasks.add_task(
+            submit_to_twelvelabs,
+            video_id,
+            url=url,
+            upload_path=upload_path,
+            upload_data=upload_data,
+            filename=file.filename if file else None,
+            content_type=file.content_type if file else None
+        )
 
         response_data = {"videoId": video_id}
-        print(f"✅ UPLOAD SUCCESS - Returning: {response_data}")
-        print("=" * 50)
+        logger.debug("✅ UPLOAD ACCEPTED - Returning: %s", response_data)
         return response_data
 
-    except requests.exceptions.RequestException as e:
-        print(f"❌ TWELVELABS API ERROR: {str(e)}")
-        print("=" * 50)
-        raise HTTPException(
-            status_code=500,
-            detail=f"TwelveLabs API error: {str(e)}"
-        )
     except Exception as e:
-        print(f"❌ INTERNAL SERVER ERROR: {str(e)}")
-        import traceback
-        traceback.print_exc()
-        print("=" * 50)
+        logger.exception("❌ Upload failed")
         raise HTTPException(
             status_code=500,
             detail=f"Internal server error: {str(e)}"
         )
 
-@app.get("/api/videos/{video_id}/status")
-async def get_video_status(video_id: str):
+async def fetch_task(task_id: str, headers: Optional[dict] = None) -> httpx.Response:
     """
-    Get the current status of a video analysis task
+    GET a TwelveLabs task, joining the request already in flight for the
+    same task_id and headers instead of sending another one
     """
-    print(f"🔍 STATUS CHECK for video_id: {video_id}")
+    # Conditional and unconditional GETs can't share a response: only the
+    # conditional caller is prepared for a 304
+    key = (task_id, frozenset((headers or {}).items()))
+    request = INFLIGHT_TASKS.get(key)
+    if request is None:
+        request = asyncio.ensure_future(
+            TL_CLIENT.get(f"/tasks/{task_id}", headers=headers)
+        )
+        INFLIGHT_TASKS[key] = request
 
-    if video_id not in DB:
-        print(f"❌ Video not found in DB: {video_id}")
-        print(f"📋 Available videos: {list(DB.keys())}")
-        raise HTTPException(status_code=404, detail="Video not found")
+        def forget(done: asyncio.Task):
+            if INFLIGHT_TASKS.get(key) is done:
+                del INFLIGHT_TASKS[key]
 
-    video_data = DB[video_id]
-    task_id = video_data["task_id"]
-    print(f"✅ Found video in DB, task_id: {task_id}")
+        request.add_done_callback(forget)
 
-    try:
-        # Check status with TwelveLabs
-        headers = {"x-api-key": TL_KEY}
-        status_url = f"{TL_API}/tasks/{task_id}"
-        print(f"📡 Checking TwelveLabs status: {status_url}")
+    # Shield the shared request so one caller's cancellation can't abort it
+    # for everyone else waiting on it
+    return await asyncio.shield(request)
 
-        response = requests.get(status_url, headers=headers, timeout=10)
-        print(f"📊 TwelveLabs status response: {response.status_code}")
-        print(f"📄 TwelveLabs status data: {response.text}")
+async def fetch_tl_video(tl_video_id: str) -> dict:
+    """
+    Get a TwelveLabs video's details; callers store them with the video
+    """
+    response = await TL_CLIENT.get(f"/videos/{tl_video_id}")
+    response.raise_for_status()
+    return orjson.loads(response.content)
 
-        response.raise_for_status()
+def stored_status(video_id: str, video_data: dict) -> dict:
+    """
+    Build a VideoStatus-shaped dict from the stored record without calling
+    TwelveLabs; it is serialized as is, skipping model validation
+    """
+    return {
+        "id": video_id,
+        "status": video_data["status"],
+        "progress": video_data["progress"],
+        "message": video_data["message"],
+        "error": video_data.get("error"),
+        "task_id": video_data["task_id"],
+        "analysis": video_data.get("analysis")
+    }
 
-        task_data = response.json()
-        tl_status = task_data.get("status", "processing")
-
-        # Map TwelveLabs status to our status
-        if tl_status == "pending":
-            status = "processing"
-            progress = 25
-            message = "Video queued for processing"
-        elif tl_status == "indexing":
-            status = "indexing"
-            progress = 50
-            message = "Analyzing video content"
-        elif tl_status == "ready":
-            status = "completed"
-            progress = 100
-            message = "Analysis complete"
-
-            # Fetch the analysis results if completed
-            if not video_data.get("analysis"):
-                try:
-                    # Get video details from TwelveLabs
-                    video_response = requests.get(
-                        f"{TL_API}/videos/{task_data.get('video_id')}",
-                        headers=headers,
-                        timeout=10
-                    )
-                    if video_response.ok:
-                        video_details = video_response.json()
-                        DB[video_id]["analysis"] = video_details
-                except:
-                    pass  # Continue without analysis details
-
-        elif tl_status == "failed":
-            status = "error"
-            progress = 0
-            message = "Analysis failed"
-            DB[video_id]["error"] = task_data.get("error_message", "Unknown error")
-        else:
-            status = "processing"
-            progress = 35
-            message = f"Processing (TL status: {tl_status})"
+def prefetch_pending(video_data: dict) -> bool:
+    """Whether a background analysis fetch started recently enough to wait for"""
+    started = video_data.get("_prefetch_started")
+    return bool(started) and time.time() - started < PREFETCH_TIMEOUT
 
-        # Update our database
-        DB[video_id].update({
+async def prefetch_analysis(video_id: str, tl_video_id: str):
+    """
+    Fetch a ready video's analysis after the status response has been sent,
+    and only then report the video as completed
+    """
+    status, progress, message = STATUS_MAP["ready"]
+    patch = {
+        "status": status,
+        "progress": progress,
+        "message": message,
+        "_prefetch_started": None
+    }
+    try:
+        # Get video details from TwelveLabs
+        patch["analysis"] = await fetch_tl_video(tl_video_id)
+    except (httpx.HTTPError, orjson.JSONDecodeError) as e:
+        # Continue without analysis details
+        logger.warning("❌ Failed to fetch analysis for %s: %s", video_id, e)
+    await DB.update(video_id, patch)
+
+async def start_prefetch(video_id: str, tl_video_id: str, background_tasks: BackgroundTasks) -> bool:
+    """
+    Schedule prefetch_analysis unless another caller did within the last
+    PREFETCH_TIMEOUT; returns True for the caller that scheduled it
+    """
+    if not await DB.mark(video_id, "analysis_attempted", ttl=PREFETCH_TIMEOUT):
+        return False
+    background_tasks.add_task(prefetch_analysis, video_id, tl_video_id)
+    return True
+
+async def apply_task_update(
+    video_id: str,
+    task_data: dict,
+    background_tasks: BackgroundTasks,
+    extra: Optional[dict] = None
+):
+    """
+    Map a TwelveLabs task payload onto our stored video record, applying
+    it together with any extra fields in a single DB update
+    """
+    tl_status = task_data.get("status", "processing")
+    patch = dict(extra or {})
+
+    # Map TwelveLabs status to our status
+    status, progress, message = STATUS_MAP.get(
+        tl_status,
+        ("processing", 35, f"Processing (TL status: {tl_status})")
+    )
+
+    if tl_status == "ready":
+        # Only prefetch_analysis reports the video completed, once the
+        # analysis is stored. It runs in the background so this response
+        # isn't held up by a second round-trip, and only the caller that
+        # starts it moves the video to indexing: anyone else, or a caller
+        # whose view predates a finished fetch, leaves the status alone
+        status = None
+        current = await DB.get(video_id)
+        if (
+            current is not None
+            and current["status"] not in TERMINAL_STATUSES
+            and await start_prefetch(video_id, task_data.get("video_id"), background_tasks)
+        ):
+            status, progress, message = "indexing", 95, "Fetching analysis results"
+            patch["tl_video_id"] = task_data.get("video_id")
+            patch["_prefetch_started"] = time.time()
+
+    elif tl_status == "failed":
+        patch["error"] = task_data.get("error_message", "Unknown error")
+
+    # Update our database
+    if status:
+        patch.update({
             "status": status,
             "progress": progress,
             "message": message
         })
+    if patch:
+        await DB.update(video_id, patch)
 
-        return VideoStatus(
-            id=video_id,
-            status=status,
-            progress=progress,
-            message=message,
-            error=video_data.get("error"),
-            task_id=task_id,
-            analysis=video_data.get("analysis")
-        )
+async def fetch_status(video_id: str, background_tasks: BackgroundTasks) -> dict:
+    """
+    Refresh a video's status from TwelveLabs when needed and return it
+    """
+    logger.debug("🔍 STATUS CHECK for video_id: %s", video_id)
+
+    video_data = await DB.get(video_id)
+    if video_data is None:
+        logger.debug("❌ Video not found in DB: %s", video_id)
+        raise HTTPException(status_code=404, detail="Video not found")
+
+    task_id = video_data["task_id"]
+    logger.debug("✅ Found video in DB, task_id: %s", task_id)
+
+    # Submission is still running (or failed) in the background
+    if not task_id:
+        return stored_status(video_id, video_data)
+
+    # Completed and failed tasks never change upstream
+    if video_data["status"] in TERMINAL_STATUSES:
+        return stored_status(video_id, video_data)
+
+    # The task is ready and its analysis is being fetched in the background
+    if prefetch_pending(video_data):
+        return stored_status(video_id, video_data)
+
+    # That fetch never finished (e.g. a restart mid-fetch), so start another;
+    # TwelveLabs sends no further webhook for a ready task
+    if video_data.get("_prefetch_started") and video_data.get("tl_video_id"):
+        if await start_prefetch(video_id, video_data["tl_video_id"], background_tasks):
+            await DB.update(video_id, {"_prefetch_started": time.time()})
+        return stored_status(video_id, video_data)
+
+    # With webhooks enabled, TwelveLabs pushes the final status to us
+    if CFG.webhook_secret:
+        return stored_status(video_id, video_data)
+
+    # Polls arriving within STATUS_POLL_INTERVAL of the last upstream check
+    # reuse the stored status instead of hitting TwelveLabs again
+    if not await DB.mark(video_id, "polled", ttl=STATUS_POLL_INTERVAL):
+        return stored_status(video_id, video_data)
+
+    try:
+        # Check status with TwelveLabs, conditionally if we have validators
+        logger.debug("📡 Checking TwelveLabs status for task: %s", task_id)
+
+        conditional_headers = {}
+        if video_data.get("_etag"):
+            conditional_headers["If-None-Match"] = video_data["_etag"]
+        if video_data.get("_last_modified"):
+            conditional_headers["If-Modified-Since"] = video_data["_last_modified"]
+
+        response = await fetch_task(task_id, headers=conditional_headers)
+        logger.debug("📊 TwelveLabs status response: %s", response.status_code)
+
+        if response.status_code == 304:
+            return stored_status(video_id, video_data)
+
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("📄 TwelveLabs status data: %s", response.content[:LOG_BODY_LIMIT])
+
+        response.raise_for_status()
+
+        task_data = orjson.loads(response.content)
+        await apply_task_update(video_id, task_data, background_tasks, {
+            "_etag": response.headers.get("ETag"),
+            "_last_modified": response.headers.get("Last-Modified")
+        })
+        return stored_status(video_id, await DB.get(video_id))
 
-    except requests.exceptions.RequestException as e:
+    except httpx.HTTPError as e:
         # Return cached status if TwelveLabs is unreachable
-        return VideoStatus(
-            id=video_id,
-            status=video_data["status"],
-            progress=video_data["progress"],
-            message=f"Status check failed: {str(e)}",
-            task_id=task_id
-        )
+        return {
+            "id": video_id,
+            "status": video_data["status"],
+            "progress": video_data["progress"],
+            "message": f"Status check failed: {str(e)}",
+            "error": None,
+            "task_id": task_id,
+            "analysis": None
+        }
+
+@app.get("/api/videos/{video_id}/status", response_model=VideoStatus)
+async def get_video_status(video_id: str, background_tasks: BackgroundTasks):
+    """
+    Get the current status of a video analysis task
+    """
+    return ORJSONResponse(await fetch_status(video_id, background_tasks))
+
+@app.post("/api/videos/status:batch")
+async def get_video_statuses(req: BatchStatusRequest, background_tasks: BackgroundTasks):
+    """
+    Get the status of several videos in one request, checking TwelveLabs
+    for all of them concurrently
+    """
+    # Check each video once however often it is listed
+    ids = list(dict.fromkeys(req.ids))
+    results = await asyncio.gather(
+        *(fetch_status(video_id, background_tasks) for video_id in ids),
+        return_exceptions=True
+    )
+
+    statuses = []
+    for video_id, result in zip(ids, results):
+        if isinstance(result, HTTPException):
+            statuses.append({"id": video_id, "error": result.detail})
+        elif isinstance(result, Exception):
+            logger.error("❌ Batch status check failed for %s: %s", video_id, result)
+            statuses.append({"id": video_id, "error": "Status check failed"})
+        else:
+            statuses.append(result)
+    return ORJSONResponse(statuses)
+
+def verify_webhook_signature(body: bytes, signature: str) -> bool:
+    """
+    Check a TL-Signature header of the form "t=<timestamp>,v1=<hex digest>"
+    """
+    try:
+        parts = dict(item.split("=", 1) for item in signature.split(","))
+        timestamp = parts["t"]
+        expected = hmac.new(
+            CFG.webhook_secret.encode(),
+            f"{timestamp}.".encode() + body,
+            hashlib.sha256
+        ).hexdigest()
+        fresh = abs(time.time() - int(timestamp)) <= WEBHOOK_TOLERANCE
+        return fresh and hmac.compare_digest(expected, parts["v1"])
+    except (KeyError, ValueError):
+        return False
+
+@app.post("/api/tl/webhook")
+async def twelvelabs_webhook(request: Request, background_tasks: BackgroundTasks):
+    """
+    Receive TwelveLabs task events and store the final status
+    """
+    if not CFG.webhook_secret:
+        raise HTTPException(status_code=404, detail="Webhooks not configured")
+
+    body = await request.body()
+    if not verify_webhook_signature(body, request.headers.get("TL-Signature", "")):
+        raise HTTPException(status_code=401, detail="Invalid webhook signature")
+
+    event = orjson.loads(body)
+    task_id = event.get("data", {}).get("id")
+    video_id = await DB.video_for_task(task_id) if task_id else None
+    logger.debug("📬 TwelveLabs webhook: %s for task %s", event.get("type"), task_id)
+
+    # Acknowledge events for tasks we don't track, and redeliveries for tasks
+    # that already finished, without another round-trip to TwelveLabs
+    video_data = await DB.get(video_id) if video_id else None
+    if (
+        video_data is None
+        or video_data["status"] in TERMINAL_STATUSES
+        or prefetch_pending(video_data)
+    ):
+        return {"received": True}
+
+    # The event only tells us something changed; fetch the task itself once
+    try:
+        response = await fetch_task(task_id)
+        response.raise_for_status()
+        await apply_task_update(video_id, orjson.loads(response.content), background_tasks)
+    except httpx.HTTPError as e:
+        logger.warning("❌ Failed to fetch task %s after webhook: %s", task_id, e)
+        raise HTTPException(status_code=502, detail="Failed to fetch task from TwelveLabs")
+
+    return {"received": True}
 
 @app.get("/api/videos/{video_id}")
 async def get_video_details(video_id: str):
     """
     Get detailed analysis results for a completed video
     """
-    if video_id not in DB:
+    video_data = await DB.get(video_id)
+    if video_data is None:
         raise HTTPException(status_code=404, detail="Video not found")
 
-    video_data = DB[video_id]
-
     if video_data["status"] != "completed":
         raise HTTPException(
             status_code=400,
@@ -323,11 +762,10 @@ async def get_video_analysis(video_id: str):
     """
     Get detailed analysis results for a completed video
     """
-    if video_id not in DB:
+    video_data = await DB.get(video_id)
+    if video_data is None:
         raise HTTPException(status_code=404, detail="Video not found")
 
-    video_data = DB[video_id]
-
     if video_data["status"] != "completed":
         raise HTTPException(
             status_code=400,
@@ -341,163 +779,484 @@ async def get_video_analysis(video_id: str):
             detail="Analysis data not available"
         )
 
-    return analysis
+    return ORJSONResponse(analysis)
 
 def transcript_to_srt(transcript, srt_path):
     """Convert transcript JSON to SRT subtitle format"""
     def ms2srt(ms):
-        s = int(ms // 1000)
-        ms = int(ms % 1000)
-        h = s // 3600
-        m = (s % 3600) // 60
-        s = s % 60
+        s, ms = divmod(int(ms), 1000)
+        m, s = divmod(s, 60)
+        h, m = divmod(m, 60)
         return f"{h:02d}:{m:02d}:{s:02d},{ms:03d}"
 
+    cues = []
+    for i, t in enumerate(transcript, start=1):
+        start_ms = t.get('startMs', 0)
+        end_ms = t.get('endMs', start_ms + 1000)
+        cues.append(f"{i}\n{ms2srt(start_ms)} --> {ms2srt(end_ms)}\n{t.get('text', '')}\n\n")
+
+    # Build the whole file in memory and write it in one call
     with open(srt_path, "w") as f:
-        for i, t in enumerate(transcript, start=1):
-            start_ms = t.get('startMs', 0)
-            end_ms = t.get('endMs', start_ms + 1000)
-            text = t.get('text', '')
-            f.write(f"{i}\n{ms2srt(start_ms)} --> {ms2srt(end_ms)}\n{text}\n\n")
-
-def run_ffmpeg_command(cmd):
-    """Run ffmpeg command safely with error handling"""
-    try:
-        print(f"🎬 Running ffmpeg: {cmd}")
-        result = subprocess.run(cmd, shell=True, capture_output=True, text=True, timeout=300)
-        if result.returncode != 0:
-            print(f"❌ FFmpeg error: {result.stderr}")
+        f.write("".join(cues))
+
+async def run_ffmpeg_command(argv: List[str]) -> bool:
+    """Run an ffmpeg argv without a shell or blocking the event loop"""
+    async with FFMPEG_SLOTS:
+        try:
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("🎬 Running ffmpeg: %s", " ".join(argv))
+            proc = await asyncio.create_subprocess_exec(
+                *argv,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.PIPE
+            )
+            try:
+                stdout, stderr = await asyncio.wait_for(proc.communicate(), FFMPEG_TIMEOUT)
+            except asyncio.TimeoutError:
+                proc.kill()
+                await proc.wait()
+                logger.warning("❌ FFmpeg timeout after %s seconds", FFMPEG_TIMEOUT)
+                return False
+            if proc.returncode != 0:
+                logger.warning("❌ FFmpeg error: %s", stderr[-LOG_BODY_LIMIT:].decode(errors="replace"))
+                return False
+            return True
+        except Exception as e:
+            logger.warning("❌ FFmpeg exception: %s", e)
             return False
-        print(f"✅ FFmpeg success: {result.stdout}")
-        return True
-    except subprocess.TimeoutExpired:
-        print("❌ FFmpeg timeout after 5 minutes")
-        return False
-    except Exception as e:
-        print(f"❌ FFmpeg exception: {str(e)}")
-        return False
 
-@app.post("/api/edits")
-async def create_edit_job(req: EditRequest):
+@app.on_event("startup")
+async def detect_video_encoder():
+    """Use NVENC if a one-frame test encode succeeds, libx264 otherwise"""
+    global VIDEO_ENCODER
+    try:
+        proc = await asyncio.create_subprocess_exec(
+            "ffmpeg", "-hide_banner", "-f", "lavfi", "-i", "color=s=256x256",
+            "-frames:v", "1", *NVENC_VIDEO_ENCODER, "-f", "null", "-",
+            stdout=asyncio.subprocess.DEVNULL,
+            stderr=asyncio.subprocess.DEVNULL
+        )
+    except OSError:
+        nvenc = False
+    else:
+        try:
+            nvenc = await asyncio.wait_for(proc.wait(), 10) == 0
+        except asyncio.TimeoutError:
+            proc.kill()
+            await proc.wait()
+            nvenc = False
+    VIDEO_ENCODER = NVENC_VIDEO_ENCODER if nvenc else CPU_VIDEO_ENCODER
+    logger.info("🎞️ Video encoder: %s", VIDEO_ENCODER[1])
+
+async def run_ffprobe(argv: List[str]) -> Optional[str]:
+    """Run an ffprobe argv and return its stdout, or None if it failed"""
+    try:
+        proc = await asyncio.create_subprocess_exec(
+            "ffprobe", "-v", "error", *argv,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE
+        )
+        try:
+            stdout, _ = await asyncio.wait_for(proc.communicate(), FFMPEG_TIMEOUT)
+        except asyncio.TimeoutError:
+            proc.kill()
+            await proc.wait()
+            return None
+    except OSError as e:
+        logger.warning("⚠️ ffprobe unavailable: %s", e)
+        return None
+    if proc.returncode != 0:
+        return None
+    return stdout.decode(errors="replace")
+
+async def keyframe_times(src_video: str) -> Optional[List[float]]:
+    """Presentation times of the video keyframes, decoding keyframes only"""
+    out = await run_ffprobe([
+        "-select_streams", "v:0", "-skip_frame", "nokey",
+        "-show_entries", "frame=pts_time", "-of", "csv=p=0",
+        src_video
+    ])
+    if out is None:
+        return None
+    times = []
+    for line in out.split():
+        try:
+            times.append(float(line.strip(",")))
+        except ValueError:
+            continue
+    return times
+
+async def has_audio(src_video: str) -> bool:
+    """Whether the source has an audio stream (assumed yes if ffprobe is missing)"""
+    out = await run_ffprobe([
+        "-select_streams", "a", "-show_entries", "stream=index", "-of", "csv=p=0",
+        src_video
+    ])
+    return out is None or bool(out.strip())
+
+def on_keyframe(t: float, keyframes: List[float]) -> bool:
+    return any(abs(t - k) <= KEYFRAME_TOLERANCE for k in keyframes)
+
+async def cut_selections(src_video: str, cuts: List[Tuple[float, float]], scratch_dir: str) -> str:
     """
-    Create video edit job from selected scenes and template settings
+    Cut and join the selected ranges of the source into one file with a single ffmpeg run.
+    Stream copy through the concat demuxer when every cut starts on a keyframe,
+    otherwise a select/aselect filter cut with one re-encode.
     """
-    print("=" * 50)
-    print("🎬 VIDEO EDIT REQUEST RECEIVED")
-    print("=" * 50)
-    print(f"📹 Video ID: {req.videoId}")
-    print(f"📊 Selections: {len(req.selections)} scenes")
-    print(f"🎨 Template: {req.templateId}")
-    print(f"📐 Aspect Ratios: {req.aspectRatios}")
-    print(f"⏱️ Durations: {req.durationsSec}")
-    print(f"📝 Captions: {req.captions}")
+    concat_video = f"{scratch_dir}/concat.mp4"
 
-    try:
-        # Generate job ID
-        job_id = f"job_{uuid.uuid4().hex[:8]}"
-        output_dir = f"/tmp/{job_id}"
-        os.makedirs(output_dir, exist_ok=True)
+    keyframes = await keyframe_times(src_video)
+    if keyframes and all(on_keyframe(start, keyframes) for start, _ in cuts):
+        concat_list = f"{scratch_dir}/list.txt"
+        with open(concat_list, "w") as f:
+            for start, end in cuts:
+                f.write(f"file '{src_video}'\ninpoint {start}\noutpoint {end}\n")
+        if await run_ffmpeg_command([
+            "ffmpeg", "-y", "-f", "concat", "-safe", "0",
+            "-i", concat_list,
+            "-c", "copy",
+            concat_video
+        ]):
+            logger.debug("✅ Stream-copied %s keyframe-aligned segments", len(cuts))
+            return concat_video
+        logger.warning("⚠️ Stream copy failed, falling back to filter cut")
+
+    ranges = "+".join(f"between(t,{start},{end})" for start, end in cuts)
+    filters = f"[0:v]select='{ranges}',setpts=N/FRAME_RATE/TB[v]"
+    maps = ["-map", "[v]"]
+    if await has_audio(src_video):
+        filters += f";[0:a]aselect='{ranges}',asetpts=N/SR/TB[a]"
+        maps += ["-map", "[a]"]
+
+    if not await run_ffmpeg_command([
+        "ffmpeg", "-y",
+        "-i", src_video,
+        "-filter_complex", filters,
+        *maps,
+        *VIDEO_ENCODER,
+        concat_video
+    ]):
+        raise RuntimeError("Failed to cut video segments")
+
+    logger.debug("✅ Filter-cut %s segments in one pass", len(cuts))
+    return concat_video
+
+def source_path(video_id: str) -> str:
+    return os.path.join(CFG.source_cache_dir, f"{video_id}.mp4")
+
+def evict_sources(keep: str):
+    """
+    Delete the least recently used cached sources until the cache fits in
+    its byte budget, sparing `keep` and sources of running edit jobs
+    """
+    with EVICTION_LOCK:
+        entries = []
+        total = 0
+        for entry in os.scandir(CFG.source_cache_dir):
+            if entry.is_file() and not entry.name.endswith(".part"):
+                try:
+                    stat = entry.stat()
+                except FileNotFoundError:
+                    continue
+                entries.append((stat.st_atime, entry.path, stat.st_size))
+                total += stat.st_size
 
-        # In real app, you'd download from TwelveLabs or cloud storage
-        # For demo, assume we have access to original video
-        src_video = f"/tmp/{req.videoId}.mp4"
+        for _, path, size in sorted(entries):
+            if total <= CFG.source_cache_bytes:
+                break
+            if path == keep or SOURCES_IN_USE[path] > 0:
+                continue
+            try:
+                os.unlink(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+            logger.info("🗑️ Evicted cached source %s", path)
+
+def cache_upload(video_id: str, upload_path: Optional[str], upload_data: Optional[bytes]) -> str:
+    """Publish an uploaded video into the source cache and return its path"""
+    os.makedirs(CFG.source_cache_dir, exist_ok=True)
+    path = source_path(video_id)
+    if upload_path:
+        shutil.move(upload_path, path)
+    else:
+        with open(f"{path}.part", "wb") as f:
+            f.write(upload_data)
+        os.replace(f"{path}.part", path)
+    return path
+
+async def check_source_url(url: httpx.URL):
+    """
+    Refuse source URLs the backend must not fetch: anything but http(s),
+    and hosts that resolve to private, loopback or link-local addresses
+    """
+    if url.scheme not in ("http", "https") or not url.host:
+        raise RuntimeError("Source URL must be http or https")
+    try:
+        infos = await asyncio.get_running_loop().getaddrinfo(
+            url.host, url.port or (443 if url.scheme == "https" else 80), type=socket.SOCK_STREAM
+        )
+    except socket.gaierror as e:
+        raise RuntimeError(f"Cannot resolve source host {url.host}") from e
+    for info in infos:
+        address = ipaddress.ip_address(info[4][0].split("%")[0])
+        if not address.is_global:
+            raise RuntimeError(f"Source host {url.host} is not a public address")
+
+async def download_source(url: str, path: str):
+    """
+    Stream a source video into the cache, publishing it atomically
+    Downloads larger than the whole cache budget are abandoned
+    """
+    os.makedirs(CFG.source_cache_dir, exist_ok=True)
+    part = f"{path}.part"
+    target = httpx.URL(url)
+    try:
+        # A separate client: TL_CLIENT would send our TwelveLabs key along.
+        # Redirects are followed by hand so every hop is checked
+        async with httpx.AsyncClient(timeout=httpx.Timeout(30.0, connect=5.0)) as client:
+            for _ in range(MAX_SOURCE_REDIRECTS + 1):
+                await check_source_url(target)
+                async with client.stream("GET", target) as response:
+                    if response.is_redirect:
+                        target = response.url.join(response.headers["Location"])
+                        continue
+                    response.raise_for_status()
+                    if int(response.headers.get("Content-Length") or 0) > CFG.source_cache_bytes:
+                        raise RuntimeError("Source video is larger than the source cache")
+                    written = 0
+                    with open(part, "wb") as f:
+                        async for chunk in response.aiter_bytes(UPLOAD_CHUNK_SIZE):
+                            written += len(chunk)
+                            if written > CFG.source_cache_bytes:
+                                raise RuntimeError("Source video is larger than the source cache")
+                            f.write(chunk)
+                    break
+            else:
+                raise RuntimeError("Too many redirects downloading the source video")
+        os.replace(part, path)
+    finally:
+        if os.path.exists(part):
+            os.unlink(part)
+    try:
+        await asyncio.to_thread(evict_sources, path)
+    except OSError as e:
+        # The download itself succeeded; a full cache is not worth failing the job
+        logger.warning("⚠️ Failed to evict cached sources: %s", e)
 
-        print(f"📁 Output directory: {output_dir}")
-        print(f"🎥 Source video: {src_video}")
+async def ensure_source(video_id: str) -> str:
+    """
+    Path of a video's source file; it is downloaded from its source URL
+    only if no upload or earlier edit job already left it in the cache
+    """
+    path = source_path(video_id)
+    try:
+        # Mark as recently used for eviction
+        os.utime(path)
+        return path
+    except FileNotFoundError:
+        # Not cached, or evicted just now
+        pass
+
+    # For demo, sources may also be dropped in /tmp by hand
+    if os.path.exists(f"/tmp/{video_id}.mp4"):
+        return f"/tmp/{video_id}.mp4"
+
+    video_data = await DB.get(video_id) or {}
+    url = video_data.get("source_url")
+    if not url:
+        raise RuntimeError("Source video not available")
+
+    download = SOURCE_DOWNLOADS.get(video_id)
+    if download is None:
+        download = asyncio.ensure_future(download_source(url, path))
+        SOURCE_DOWNLOADS[video_id] = download
+
+        def forget(done: asyncio.Task):
+            if SOURCE_DOWNLOADS.get(video_id) is done:
+                del SOURCE_DOWNLOADS[video_id]
+
+        download.add_done_callback(forget)
+
+    logger.debug("⬇️ Downloading source for %s", video_id)
+    await asyncio.shield(download)
+    return path
+
+def pick_scratch_root() -> Optional[str]:
+    """First scratch root with SCRATCH_MIN_FREE bytes free, if any"""
+    for root in SCRATCH_ROOTS:
+        if shutil.disk_usage(root).free >= SCRATCH_MIN_FREE:
+            return root
+    return None
+
+async def run_edit_job(job_id: str, req: EditRequest, scratch_root: str):
+    """
+    Run the ffmpeg pipeline for an edit job and record the outcome in JOBS
+    """
+    # Keep our own reference: the JOBS entry may expire while we run
+    job = JOBS[job_id]
+    job["status"] = "running"
 
-        # Step 1: Extract selected segments
-        parts = []
-        for i, seg in enumerate(req.selections):
-            start_sec = seg["startMs"] / 1000.0
-            end_sec = seg["endMs"] / 1000.0
-            part_file = f"{output_dir}/part{i}.mp4"
+    # Intermediates go to scratch space (tmpfs when it has room); only the final renders
+    # are written to the job's output directory
+    scratch_dir = f"{scratch_root}/{job_id}"
+    src_video = None
 
-            cmd = f'ffmpeg -y -ss {start_sec} -to {end_sec} -i "{src_video}" -c copy "{part_file}"'
-            if run_ffmpeg_command(cmd):
-                parts.append(part_file)
-                print(f"✅ Created part {i}: {start_sec}s - {end_sec}s")
-            else:
-                print(f"❌ Failed to create part {i}")
+    try:
+        output_dir = job["outputDir"]
+        os.makedirs(output_dir, exist_ok=True)
+        os.makedirs(scratch_dir, exist_ok=True)
 
-        if not parts:
-            raise HTTPException(status_code=500, detail="Failed to extract any video segments")
+        src_video = await ensure_source(req.videoId)
+        SOURCES_IN_USE[src_video] += 1
 
-        # Step 2: Concatenate parts
-        concat_list = f"{output_dir}/list.txt"
-        with open(concat_list, "w") as f:
-            for p in parts:
-                f.write(f"file '{p}'\n")
+        logger.debug("📁 Output directory: %s", output_dir)
+        logger.debug("🎥 Source video: %s", src_video)
 
-        concat_video = f"{output_dir}/concat.mp4"
-        cmd = f'ffmpeg -y -f concat -safe 0 -i "{concat_list}" -c copy "{concat_video}"'
-        if not run_ffmpeg_command(cmd):
-            raise HTTPException(status_code=500, detail="Failed to concatenate video segments")
+        # Step 1+2: Cut the selected segments and join them in one ffmpeg run
+        cuts = [
+            (seg["startMs"] / 1000.0, seg["endMs"] / 1000.0)
+            for seg in req.selections
+            if seg["endMs"] > seg["startMs"]
+        ]
+        if not cuts:
+            raise RuntimeError("No valid video segments selected")
 
-        print(f"✅ Concatenated video: {concat_video}")
+        concat_video = await cut_selections(src_video, cuts, scratch_dir)
+        logger.debug("✅ Concatenated video: %s", concat_video)
 
         # Step 3: Generate outputs for each duration and aspect ratio
-        outputs = []
         aspect_dims = {
             "9:16": (1080, 1920),
             "1:1": (1080, 1080),
             "16:9": (1920, 1080)
         }
 
-        for duration in req.durationsSec:
-            # First trim to target duration
-            trimmed_video = f"{output_dir}/concat_{duration}s.mp4"
-            cmd = f'ffmpeg -y -t {duration} -i "{concat_video}" -c copy "{trimmed_video}"'
-            if not run_ffmpeg_command(cmd):
-                print(f"❌ Failed to trim to {duration}s")
-                continue
-
-            for aspect_ratio in req.aspectRatios:
-                if aspect_ratio not in aspect_dims:
-                    print(f"❌ Unknown aspect ratio: {aspect_ratio}")
-                    continue
-
+        # Write captions once up front; every render burns the same file
+        srt_file = None
+        if req.captions == "burned":
+            # Try to get transcript from analysis
+            video_data = await DB.get(req.videoId) or {}
+            analysis = video_data.get("analysis") or {}
+            transcript = analysis.get("transcript", [])
+
+            if transcript:
+                srt_file = f"{scratch_dir}/captions.srt"
+                transcript_to_srt(transcript, srt_file)
+                logger.debug("📝 Added burned captions from transcript")
+
+        aspect_ratios = []
+        for aspect_ratio in req.aspectRatios:
+            if aspect_ratio in aspect_dims:
+                aspect_ratios.append(aspect_ratio)
+            else:
+                logger.warning("❌ Unknown aspect ratio: %s", aspect_ratio)
+
+        async def render_duration(duration: int) -> List[str]:
+            # One ffmpeg pass per duration: read only the first `duration`
+            # seconds, decode once and split the frames into one
+            # scale/pad(/subtitles) branch per aspect ratio
+            if not aspect_ratios:
+                return []
+
+            graph = [f"[0:v]split={len(aspect_ratios)}" + "".join(f"[v{i}]" for i in range(len(aspect_ratios)))]
+            output_args = []
+            output_files = []
+            for i, aspect_ratio in enumerate(aspect_ratios):
                 w, h = aspect_dims[aspect_ratio]
                 output_file = f"{output_dir}/{duration}s_{aspect_ratio.replace(':', 'x')}.mp4"
 
                 # Scale and pad to target dimensions
                 vf = f"scale={w}:{h}:force_original_aspect_ratio=decrease,pad={w}:{h}:(ow-iw)/2:(oh-ih)/2"
-
-                # Add captions if requested
-                if req.captions == "burned":
-                    # Try to get transcript from analysis
-                    video_data = DB.get(req.videoId, {})
-                    analysis = video_data.get("analysis", {})
-                    transcript = analysis.get("transcript", [])
-
-                    if transcript:
-                        srt_file = f"{output_dir}/captions.srt"
-                        transcript_to_srt(transcript, srt_file)
-                        vf += f",subtitles={srt_file}"
-                        print(f"📝 Added burned captions from transcript")
-
-                cmd = f'ffmpeg -y -i "{trimmed_video}" -vf "{vf}" -c:a copy "{output_file}"'
-                if run_ffmpeg_command(cmd):
-                    outputs.append(output_file)
-                    print(f"✅ Generated: {duration}s {aspect_ratio} → {output_file}")
-                else:
-                    print(f"❌ Failed to generate: {duration}s {aspect_ratio}")
-
-        print(f"🎉 Edit job completed: {len(outputs)} files generated")
-        print("=" * 50)
-
-        return {
-            "jobId": job_id,
+                if srt_file:
+                    vf += f",subtitles={srt_file}"
+
+                graph.append(f"[v{i}]{vf}[v{i}o]")
+                output_args += ["-map", f"[v{i}o]", "-map", "0:a?", *VIDEO_ENCODER, "-c:a", "copy", output_file]
+                output_files.append(output_file)
+
+            if not await run_ffmpeg_command([
+                "ffmpeg", "-y", "-t", str(duration),
+                "-i", concat_video,
+                "-filter_complex", ";".join(graph),
+                *output_args
+            ]):
+                logger.warning("❌ Failed to generate %ss outputs", duration)
+                return []
+
+            logger.debug("✅ Generated %ss: %s", duration, output_files)
+            return output_files
+
+        # Durations are independent, so render them concurrently, bounded
+        # by FFMPEG_SLOTS
+        rendered = await asyncio.gather(*(
+            render_duration(duration) for duration in req.durationsSec
+        ))
+        outputs = [f for files in rendered for f in files]
+
+        logger.info("🎉 Edit job %s completed: %s files generated", job_id, len(outputs))
+
+        job.update({
+            "status": "completed",
             "files": outputs,
-            "outputDir": output_dir,
             "message": f"Successfully generated {len(outputs)} video files"
-        }
+        })
 
     except Exception as e:
-        print(f"❌ Edit job failed: {str(e)}")
-        import traceback
-        traceback.print_exc()
-        print("=" * 50)
-        raise HTTPException(status_code=500, detail=f"Edit job failed: {str(e)}")
+        logger.exception("❌ Edit job %s failed", job_id)
+        job.update({
+            "status": "error",
+            "message": "Edit job failed",
+            "error": str(e)
+        })
+    finally:
+        if src_video:
+            SOURCES_IN_USE[src_video] -= 1
+            if SOURCES_IN_USE[src_video] <= 0:
+                del SOURCES_IN_USE[src_video]
+        shutil.rmtree(scratch_dir, ignore_errors=True)
+
+@app.post("/api/edits")
+async def create_edit_job(req: EditRequest, background_tasks: BackgroundTasks):
+    """
+    Queue a video edit job from selected scenes and template settings
+    Returns a jobId immediately; poll /api/edits/{jobId} for the result
+    """
+    logger.debug(
+        "🎬 VIDEO EDIT REQUEST RECEIVED video=%s selections=%s template=%s aspect_ratios=%s durations=%s captions=%s",
+        req.videoId, len(req.selections), req.templateId, req.aspectRatios, req.durationsSec, req.captions
+    )
+
+    # Refuse new jobs rather than exhaust the scratch space
+    scratch_root = pick_scratch_root()
+    if scratch_root is None:
+        raise HTTPException(status_code=503, detail="Not enough scratch space, try again later")
+
+    # Generate job ID
+    job_id = f"job_{secrets.token_hex(4)}"
+    JOBS[job_id] = {
+        "status": "queued",
+        "files": [],
+        "outputDir": f"/tmp/{job_id}",
+        "message": "Edit job queued",
+        "error": None,
+        "created_at": time.time()
+    }
+
+    background_tasks.add_task(run_edit_job, job_id, req, scratch_root)
+
+    return {"jobId": job_id, "status": "queued"}
+
+@app.get("/api/edits/{job_id}")
+async def get_edit_job(job_id: str):
+    """
+    Get the status and output files of an edit job
+    """
+    job = JOBS.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Edit job not found")
+
+    return {"jobId": job_id, **job}
 
 @app.get("/health")
 async def health_check():
@@ -507,9 +1266,20 @@ async def health_check():
     return {
         "status": "healthy",
         "timestamp": time.time(),
-        "twelvelabs_configured": bool(TL_KEY and INDEX_ID)
+        "twelvelabs_configured": bool(CFG.tl_key and CFG.index_id)
     }
 
 if __name__ == "__main__":
+    import sys
     import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=8000)
\ No newline at end of file
+    # Edit jobs and, without REDIS_URL, video records live in process memory,
+    # so keep the default of one worker unless WEB_CONCURRENCY is raised deliberately
+    uvicorn.run(
+        "main:app",
+        host="0.0.0.0",
+        port=8000,
+        workers=int(os.environ.get("WEB_CONCURRENCY", "1")),
+        loop="uvloop" if sys.platform != "win32" else "asyncio",
+        http="httptools",
+        log_level="warning"
+    )
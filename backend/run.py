@@ -4,8 +4,12 @@ import subprocess
 import sys
 import os
 
-def run_backend():
-    """Run the FastAPI backend server"""
+def run_backend(production=False):
+    """
+    Run the FastAPI backend server
+    Development mode auto-reloads on code changes; production mode
+    (python run.py --prod) runs WEB_CONCURRENCY workers instead
+    """
 
     # Check if we're in a virtual environment
     if not hasattr(sys, 'real_prefix') and not (hasattr(sys, 'base_prefix') and sys.base_prefix != sys.prefix):
@@ -34,14 +38,24 @@ def run_backend():
     print("🔄 Press Ctrl+C to stop the server")
     print()
 
+    command = [
+        sys.executable, "-m", "uvicorn",
+        "main:app",
+        "--host", "0.0.0.0",
+        "--port", "8000",
+        "--http", "httptools"
+    ]
+    if sys.platform != "win32":
+        command += ["--loop", "uvloop"]
+    if production:
+        # Edit jobs (and video records without REDIS_URL) live in process
+        # memory, so more than one worker needs WEB_CONCURRENCY set deliberately
+        command += ["--workers", os.environ.get("WEB_CONCURRENCY", "1")]
+    else:
+        command += ["--reload"]
+
     try:
-        subprocess.run([
-            sys.executable, "-m", "uvicorn",
-            "main:app",
-            "--host", "0.0.0.0",
-            "--port", "8000",
-            "--reload"
-        ], check=True)
+        subprocess.run(command, check=True)
     except KeyboardInterrupt:
         print("\n🛑 Server stopped")
     except subprocess.CalledProcessError as e:
@@ -50,4 +64,4 @@ def run_backend():
         print("   pip install -r requirements.txt")
 
 if __name__ == "__main__":
-    run_backend()
\ No newline at end of file
+    run_backend(production="--prod" in sys.argv[1:])
\ No newline at end of file
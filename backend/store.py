@@ -0,0 +1,150 @@
+import time
+import logging
+import orjson
+from cachetools import TTLCache
+from typing import Optional, Callable
+
+logger = logging.getLogger("video_api")
+
+# Seconds a video record is kept after its last update
+VIDEO_TTL = 24 * 3600
+
+# Most video records kept in process memory
+MEMORY_MAX_VIDEOS = 10_000
+
+# Seconds a fetched TwelveLabs analysis is kept in Redis
+ANALYSIS_TTL = 7 * 24 * 3600
+
+class CountingTTLCache(TTLCache):
+    """
+    TTLCache that counts and logs the entries it drops, optionally handing
+    each one to on_evict(key, value) for cleanup
+    """
+
+    def __init__(self, name: str, maxsize: int, ttl: float, on_evict: Optional[Callable] = None):
+        super().__init__(maxsize=maxsize, ttl=ttl)
+        self.name = name
+        self.evictions = 0
+        self.on_evict = on_evict
+
+    def popitem(self):
+        # Only called when the cache is full, so it is worth a warning
+        item = super().popitem()
+        self.evictions += 1
+        logger.warning("🗑️ %s full, evicted %s (%s evictions)", self.name, item[0], self.evictions)
+        if self.on_evict:
+            self.on_evict(*item)
+        return item
+
+    def expire(self, time=None):
+        expired = super().expire(time)
+        if expired:
+            self.evictions += len(expired)
+            logger.debug("🗑️ %s expired %s entries (%s evictions)", self.name, len(expired), self.evictions)
+            if self.on_evict:
+                for item in expired:
+                    self.on_evict(*item)
+        return expired
+
+class MemoryStore:
+    """
+    Video records kept in process memory (single worker, lost on restart)
+    Every operation completes without awaiting, so no lock is needed.
+    Records expire VIDEO_TTL after their last update, oldest first when full.
+    """
+
+    def __init__(self):
+        self.videos = CountingTTLCache("videos", MEMORY_MAX_VIDEOS, VIDEO_TTL)
+        self.tasks = CountingTTLCache("tasks", MEMORY_MAX_VIDEOS, VIDEO_TTL)
+        self.marks = CountingTTLCache("marks", 4 * MEMORY_MAX_VIDEOS, VIDEO_TTL)
+
+    async def get(self, video_id: str) -> Optional[dict]:
+        record = self.videos.get(video_id)
+        return dict(record) if record is not None else None
+
+    async def update(self, video_id: str, fields: dict):
+        """Create the record or merge fields into it"""
+        record = self.videos.get(video_id, {})
+        record.update(fields)
+        # Reassigning restarts the record's TTL
+        self.videos[video_id] = record
+
+    async def mark(self, video_id: str, name: str, ttl: Optional[float] = None) -> bool:
+        """
+        Set a named flag on a video unless it is already set (or has not
+        expired yet). Returns True for the caller that set it.
+        """
+        key = (video_id, name)
+        now = time.time()
+        expires = self.marks.get(key)
+        if expires is not None and (expires is True or expires > now):
+            return False
+        self.marks[key] = now + ttl if ttl else True
+        return True
+
+    async def link_task(self, task_id: str, video_id: str):
+        self.tasks[task_id] = video_id
+
+    async def video_for_task(self, task_id: str) -> Optional[str]:
+        return self.tasks.get(task_id)
+
+    async def close(self):
+        pass
+
+class RedisStore:
+    """
+    Video records kept in Redis hashes, shared by every worker and restart
+
+    video:{id}           hash of orjson-encoded fields, expires VIDEO_TTL after the last update
+    video:{id}:analysis  orjson analysis payload, expires after ANALYSIS_TTL
+    video:{id}:{flag}    flags set with SET NX
+    task:{task_id}       videoId of a TwelveLabs task, expires after VIDEO_TTL
+    """
+
+    def __init__(self, url: str):
+        from redis import asyncio as aioredis
+        self.redis = aioredis.from_url(url)
+
+    async def get(self, video_id: str) -> Optional[dict]:
+        async with self.redis.pipeline(transaction=False) as pipe:
+            pipe.hgetall(f"video:{video_id}")
+            pipe.get(f"video:{video_id}:analysis")
+            fields, analysis = await pipe.execute()
+        if not fields:
+            return None
+        record = {key.decode(): orjson.loads(value) for key, value in fields.items()}
+        record["analysis"] = orjson.loads(analysis) if analysis else None
+        return record
+
+    async def update(self, video_id: str, fields: dict):
+        """Create the record or merge fields into it with a single HSET"""
+        fields = dict(fields)
+        analysis = fields.pop("analysis", None)
+        async with self.redis.pipeline(transaction=False) as pipe:
+            if fields:
+                pipe.hset(
+                    f"video:{video_id}",
+                    mapping={key: orjson.dumps(value) for key, value in fields.items()}
+                )
+                pipe.expire(f"video:{video_id}", VIDEO_TTL)
+            if analysis is not None:
+                pipe.set(f"video:{video_id}:analysis", orjson.dumps(analysis), ex=ANALYSIS_TTL)
+            await pipe.execute()
+
+    async def mark(self, video_id: str, name: str, ttl: Optional[float] = None) -> bool:
+        """
+        Set a named flag on a video unless it is already set (or has not
+        expired yet). Returns True for the caller that set it.
+        """
+        px = int((ttl or VIDEO_TTL) * 1000)
+        return bool(await self.redis.set(f"video:{video_id}:{name}", 1, nx=True, px=px))
+
+    async def link_task(self, task_id: str, video_id: str):
+        await self.redis.set(f"task:{task_id}", video_id, ex=VIDEO_TTL)
+
+    async def video_for_task(self, task_id: str) -> Optional[str]:
+        video_id = await self.redis.get(f"task:{task_id}")
+        return video_id.decode() if video_id else None
+
+    async def close(self):
+        await self.redis.aclose()
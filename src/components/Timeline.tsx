@@ -181,10 +181,31 @@ export default function Timeline({ videoId }: TimelineProps) {
         throw new Error(`Edit request failed: ${response.statusText}`);
       }
 
-      const result = await response.json();
-      console.log('✅ Edit job created:', result);
+      const { jobId } = await response.json();
+      console.log('✅ Edit job queued:', jobId);
 
-      alert(`🎉 Successfully generated ${result.files?.length || 0} video files!\nJob ID: ${result.jobId}`);
+      // The backend renders in the background; poll the job until it finishes
+      let result;
+      while (true) {
+        await new Promise(resolve => setTimeout(resolve, 2000));
+
+        const jobResponse = await fetch(`/api/edits/${jobId}`);
+        if (!jobResponse.ok) {
+          throw new Error(`Edit job status failed: ${jobResponse.statusText}`);
+        }
+
+        result = await jobResponse.json();
+        if (result.status === 'completed' || result.status === 'error') {
+          break;
+        }
+      }
+
+      if (result.status === 'error') {
+        throw new Error(result.error || result.message || 'Edit job failed');
+      }
+
+      console.log('✅ Edit job completed:', result);
+      alert(`🎉 Successfully generated ${result.files?.length || 0} video files!\nJob ID: ${jobId}`);
 
     } catch (error) {
       console.error('❌ Edit generation error:', error);
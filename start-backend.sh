@@ -35,4 +35,4 @@ echo "🚀 Backend server starting on http://localhost:8000"
 echo "📖 API docs available at http://localhost:8000/docs"
 
 # Start the FastAPI server with uvicorn
-python -m uvicorn main:app --host 0.0.0.0 --port 8000 --reload
\ No newline at end of file
+python -m uvicorn main:app --host 0.0.0.0 --port 8000 --loop uvloop --http httptools --reload
\ No newline at end of file